@@ -1,10 +1,13 @@
 """
 GUI配置管理器 - 用于持久化用户配置
 """
+import contextlib
 import json
 import os
+import tempfile
+from collections import ChainMap
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,8 +31,10 @@ class ConfigManager:
             "window_geometry": None
         }
         
-        # 当前配置
-        self.config = self.default_config.copy()
+        # 当前配置：用户修改层叠在默认值之上，读取时自动回落到默认值
+        self.config: ChainMap[str, Any] = ChainMap({}, self.default_config)
+        # 内存中的配置是否有未保存的修改
+        self._dirty = False
         
         # 确保配置目录存在
         self._ensure_config_dir()
@@ -44,33 +49,48 @@ class ConfigManager:
         except Exception as e:
             logger.error(f"创建配置目录失败: {e}")
     
-    def load_config(self) -> Dict[str, Any]:
+    def load_config(self) -> ChainMap[str, Any]:
         """从文件加载配置"""
         try:
             if self.config_file.exists():
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     saved_config = json.load(f)
-                    # 合并配置（保留默认值中的新键）
-                    self.config = {**self.default_config, **saved_config}
+                    # 已保存的配置覆盖默认值（保留默认值中的新键）
+                    self.config = ChainMap(saved_config, self.default_config)
                     logger.info(f"成功加载配置: {self.config_file}")
             else:
                 logger.info("配置文件不存在，使用默认配置")
-                self.config = self.default_config.copy()
+                self.config = ChainMap({}, self.default_config)
         except Exception as e:
             logger.error(f"加载配置失败: {e}")
-            self.config = self.default_config.copy()
+            self.config = ChainMap({}, self.default_config)
         
+        self._dirty = False
         return self.config
     
     def save_config(self) -> bool:
-        """保存配置到文件"""
+        """保存配置到文件，没有修改时直接返回"""
+        if not self._dirty:
+            return True
+        tmp_path: Optional[str] = None
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            # 先写同目录临时文件再原子替换，写入中途崩溃不会损坏原配置
+            with tempfile.NamedTemporaryFile(
+                    'w', encoding='utf-8', dir=self.config_dir, suffix='.tmp', delete=False
+                    ) as f:
+                tmp_path = f.name
+                # 只保存与默认值不同的用户修改
+                json.dump(self.config.maps[0], f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.config_file)
+            self._dirty = False
             logger.info(f"成功保存配置: {self.config_file}")
             return True
         except Exception as e:
             logger.error(f"保存配置失败: {e}")
+            # 写入或替换失败时删除残留的临时文件
+            if tmp_path:
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp_path)
             return False
     
     def get(self, key: str, default: Any = None) -> Any:
@@ -78,14 +98,25 @@ class ConfigManager:
         return self.config.get(key, default)
     
     def set(self, key: str, value: Any) -> None:
-        """设置配置值"""
-        self.config[key] = value
+        """设置配置值，与默认值相同时移除用户修改，使保存的文件只含与默认值不同的项"""
+        overrides = self.config.maps[0]
+        if key in self.default_config and self.default_config[key] == value:
+            if key in overrides:
+                del overrides[key]
+                self._dirty = True
+            return
+        if key in overrides and overrides[key] == value:
+            return
+        overrides[key] = value
+        self._dirty = True
     
     def update(self, updates: Dict[str, Any]) -> None:
         """批量更新配置"""
-        self.config.update(updates)
+        for key, value in updates.items():
+            self.set(key, value)
     
     def reset_to_defaults(self) -> None:
         """重置为默认配置"""
-        self.config = self.default_config.copy()
+        self.config.maps[0].clear()
+        self._dirty = True
         logger.info("配置已重置为默认值")
\ No newline at end of file
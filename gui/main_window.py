@@ -4,10 +4,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import asyncio
+import collections
+import concurrent.futures
+import logging
+import logging.handlers
 import threading
 import queue
 import sys
 import os
+from typing import Callable
 import pyaudio
 import dotenv
 
@@ -15,9 +20,8 @@ import dotenv
 dotenv.load_dotenv()
 
 try:
-    from src.adapters.type import AdapterType
+    from src.adapters.type import AdapterType, ADAPTER_NAMES
     from src.config import VOLCENGINE_APP_ID, VOLCENGINE_ACCESS_TOKEN
-    from src.unified_app import UnifiedAudioApp
     from logger import logger
     from gui.config_manager import ConfigManager
 except ImportError as e:
@@ -25,6 +29,30 @@ except ImportError as e:
     import sys
     sys.exit(1)
 
+
+# 适配器类型 -> 向配置中补充该适配器专属参数的函数（没有专属参数的适配器不列出）
+CONFIG_BUILDERS: dict[AdapterType, Callable[['MainWindow', dict], None]] = {
+    AdapterType.BROWSER: lambda w, cfg: cfg.update(proxy_url=w.proxy_url_var.get()),
+    AdapterType.TOUCH_DESIGNER: lambda w, cfg: cfg.update(
+        td_ip=w.td_ip_var.get(), td_port=int(w.td_port_var.get())),
+    AdapterType.TOUCH_DESIGNER_WEBRTC: lambda w, cfg: cfg.update(
+        signaling_port=int(w.signaling_port_var.get())),
+    AdapterType.TOUCH_DESIGNER_WEBRTC_PROPER: lambda w, cfg: cfg.update(
+        signaling_port=int(w.signaling_port_var.get()), webrtc_port=int(w.webrtc_port_var.get())),
+}
+
+
+class _TkTextHandler(logging.Handler):
+    """在日志监听线程中格式化记录，交给主窗口显示"""
+
+    def __init__(self, window: 'MainWindow'):
+        super().__init__()
+        self.window = window
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.window._append_log(self.format(record))
+
+
 class MainWindow:
     def __init__(self):
         self.root = tk.Tk()
@@ -37,15 +65,31 @@ class MainWindow:
         # 应用状态
         self.app_instance = None
         self.is_running = False
-        self.app_thread = None
-        
-        # 日志队列
-        self.log_queue = queue.Queue()
+        self._future: concurrent.futures.Future | None = None
+        
+        # 常驻事件循环，多次启动/停止复用同一个循环
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        
+        # 日志队列：log_queue 存放已格式化的文本，供界面显示
+        # 单生产者（日志监听线程）单消费者（主线程），deque 的 append/popleft 本身线程安全，无需加锁
+        # 不设上限，避免静默丢弃日志；主线程每 200ms 取空，显示行数由 max_log_lines 限制
+        self.log_queue: collections.deque[str] = collections.deque()
+        self._record_queue = queue.Queue()
+        self._queue_handler = None
+        self._queue_listener = None
+        # 日志窗口最多保留的行数，超出后删除最早的日志
+        self.max_log_lines = 5000
         
         # 音频设备
         self.audio_devices = {"input": [], "output": []}
         self.selected_input_device = None
         self.selected_output_device = None
+        # 与下拉框选项一一对应的设备索引，按 current() 位置直接查找
+        self._input_indices: list[int] = []
+        self._output_indices: list[int] = []
+        # 后台扫描结果，由主线程轮询取走（失败时为 None）
+        self._device_scan_results: queue.SimpleQueue = queue.SimpleQueue()
         
         # 从配置恢复窗口大小
         if self.config_manager.get("window_geometry"):
@@ -69,13 +113,12 @@ class MainWindow:
         ttk.Label(config_frame, text="适配器类型:").grid(row=0, column=0, sticky=tk.W, pady=2)
         self.adapter_var = tk.StringVar(value=self.config_manager.get("adapter_type", "local"))
         adapter_combo = ttk.Combobox(config_frame, textvariable=self.adapter_var, width=30)
-        adapter_combo['values'] = ("local", "browser", "touchdesigner", "touchdesigner-webrtc", "touchdesigner-webrtc-proper", "text-input")
+        adapter_combo['values'] = tuple(ADAPTER_NAMES)
         adapter_combo.grid(row=0, column=1, sticky=(tk.W, tk.E), pady=2)
         adapter_combo.bind('<<ComboboxSelected>>', self.on_adapter_change)
         
-        # 动态配置区域
-        self.dynamic_frame = ttk.Frame(config_frame)
-        self.dynamic_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N), pady=(10, 0))
+        # 动态配置区域：每种适配器一个，按需显示
+        self._adapter_frames = self._build_adapter_frames(config_frame)
         
         # 通用配置（从配置加载）
         ttk.Label(config_frame, text="机器人名称:").grid(row=2, column=0, sticky=tk.W, pady=2)
@@ -153,109 +196,136 @@ class MainWindow:
         
     def setup_logging(self):
         """设置日志处理"""
-        # 使用更长的间隔减少主线程负载
+        # 所有模块的日志经 QueueHandler 入队，由 QueueListener 线程格式化后送往界面
+        self._queue_handler = logging.handlers.QueueHandler(self._record_queue)
+        self._queue_handler.setLevel(logging.INFO)
+        text_handler = _TkTextHandler(self)
+        text_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s', '%H:%M:%S'))
+        self._queue_listener = logging.handlers.QueueListener(self._record_queue, text_handler)
+        self._queue_listener.start()
+        logging.getLogger().addHandler(self._queue_handler)
+
+        # 主线程定时取走日志；其他线程只写队列，不直接调用 Tk
         self.root.after(200, self.process_log_queue)
         
     def process_log_queue(self):
         """处理日志队列"""
+        self.root.after(200, self.process_log_queue)
+        if not self.log_queue:
+            return
+        # 一次取走队列中全部日志，合并为一次插入和一次滚动
+        messages = []
         try:
-            # 批量处理日志，减少UI更新频率
-            messages = []
-            for _ in range(10):  # 最多处理10条消息
-                try:
-                    record = self.log_queue.get_nowait()
-                    messages.append(record)
-                except queue.Empty:
-                    break
-            
-            if messages:
-                self.log_text.insert(tk.END, "\n".join(messages) + "\n")
-                self.log_text.see(tk.END)
-                
-        except Exception as e:
+            while True:
+                messages.append(self.log_queue.popleft())
+        except IndexError:
             pass
-        finally:
-            self.root.after(200, self.process_log_queue)
+
+        if messages:
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            if line_count > self.max_log_lines:
+                self.log_text.delete('1.0', f'{line_count - self.max_log_lines}.0')
+            self.log_text.see(tk.END)
             
     def log_message(self, message):
         """添加日志消息"""
-        self.log_queue.put(message)
+        logger.info(message)
+
+    def _append_log(self, message: str) -> None:
+        """将日志文本放入显示队列，可在任意线程调用；不调用任何 Tk 接口，由主线程轮询取走"""
+        self.log_queue.append(message)
         
     def scan_audio_devices(self):
-        """扫描音频设备"""
+        """在后台线程扫描音频设备，避免阻塞界面"""
+        logger.info("开始扫描音频设备...")
+        threading.Thread(target=self._scan_audio_devices_worker, daemon=True).start()
+        self.root.after(100, self._poll_device_scan)
+
+    def _poll_device_scan(self):
+        """主线程轮询后台扫描结果"""
         try:
-            print("开始扫描音频设备...")
+            result = self._device_scan_results.get_nowait()
+        except queue.Empty:
+            self.root.after(100, self._poll_device_scan)
+            return
+        if result is not None:
+            self._apply_device_scan(result)
+
+    def _scan_audio_devices_worker(self):
+        """扫描音频设备（后台线程，不访问界面控件）"""
+        try:
+            # 每次扫描使用独立的 PyAudio 实例：PortAudio 只在初始化时枚举设备，刷新时才能发现新插入的设备
             p = pyaudio.PyAudio()
             
-            # 清空设备列表
-            self.audio_devices = {"input": [], "output": []}
-            
-            # 扫描设备
-            info = p.get_host_api_info_by_index(0)
-            numdevices = info.get('deviceCount')
-            print(f"发现 {numdevices} 个音频设备")
+            # 扫描默认 host API 下的设备
+            numdevices = p.get_device_count()
+            logger.info(f"发现 {numdevices} 个音频设备")
             
             input_devices = []
             output_devices = []
             
             for i in range(numdevices):
-                device_info = p.get_device_info_by_host_api_device_index(0, i)
+                device_info = p.get_device_info_by_index(i)
+                if device_info.get('hostApi') != 0:
+                    continue
                 device_name = device_info.get('name')
                 
                 if device_info.get('maxInputChannels') > 0:
                     input_devices.append((i, device_name))
-                    self.audio_devices["input"].append({"index": i, "name": device_name})
                 
                 if device_info.get('maxOutputChannels') > 0:
                     output_devices.append((i, device_name))
-                    self.audio_devices["output"].append({"index": i, "name": device_name})
-            
-            # 更新下拉框
-            input_names = [f"[{idx}] {name}" for idx, name in input_devices]
-            output_names = [f"[{idx}] {name}" for idx, name in output_devices]
-            
-            self.input_device_combo['values'] = input_names
-            self.output_device_combo['values'] = output_names
-            
-            # 尝试恢复上次选择的设备，否则选择第一个设备作为默认
-            last_input = self.config_manager.get("last_input_device")
-            last_output = self.config_manager.get("last_output_device")
-            
-            if last_input and last_input in input_names:
-                self.input_device_combo.set(last_input)
-                device_index = int(last_input.split(']')[0][1:])
-                self.selected_input_device = device_index
-            elif input_names:
-                self.input_device_combo.set(input_names[0])
-                self.selected_input_device = input_devices[0][0]
-            
-            if last_output and last_output in output_names:
-                self.output_device_combo.set(last_output)
-                device_index = int(last_output.split(']')[0][1:])
-                self.selected_output_device = device_index
-            elif output_names:
-                self.output_device_combo.set(output_names[0])
-                self.selected_output_device = output_devices[0][0]
-                
-            # 绑定选择事件
-            self.input_device_combo.bind('<<ComboboxSelected>>', self.on_input_device_change)
-            self.output_device_combo.bind('<<ComboboxSelected>>', self.on_output_device_change)
             
             p.terminate()
-            print(f"扫描完成：找到 {len(input_devices)} 个输入设备，{len(output_devices)} 个输出设备")
-            self.log_message(f"扫描完成：找到 {len(input_devices)} 个输入设备，{len(output_devices)} 个输出设备")
-            
         except Exception as e:
-            print(f"扫描音频设备失败: {str(e)}")
             self.log_message(f"扫描音频设备失败: {str(e)}")
+            self._device_scan_results.put(None)
+            return
+
+        # 不在后台线程调用 Tk，结果交给主线程轮询处理
+        self._device_scan_results.put((input_devices, output_devices))
+
+    def _apply_device_scan(self, result):
+        """用扫描结果更新设备列表和下拉框（主线程）"""
+        input_devices, output_devices = result
+        self.audio_devices = {
+            "input": [{"index": idx, "name": name} for idx, name in input_devices],
+            "output": [{"index": idx, "name": name} for idx, name in output_devices],
+        }
+        
+        # 更新下拉框
+        input_names = [f"[{idx}] {name}" for idx, name in input_devices]
+        output_names = [f"[{idx}] {name}" for idx, name in output_devices]
+        
+        self.input_device_combo['values'] = input_names
+        self.output_device_combo['values'] = output_names
+        self._input_indices = [idx for idx, _ in input_devices]
+        self._output_indices = [idx for idx, _ in output_devices]
+        
+        # 尝试恢复上次选择的设备，否则选择第一个设备作为默认
+        last_input = self.config_manager.get("last_input_device")
+        last_output = self.config_manager.get("last_output_device")
+        
+        if input_names:
+            self.input_device_combo.current(input_names.index(last_input) if last_input in input_names else 0)
+            self.selected_input_device = self._input_indices[self.input_device_combo.current()]
+        
+        if output_names:
+            self.output_device_combo.current(output_names.index(last_output) if last_output in output_names else 0)
+            self.selected_output_device = self._output_indices[self.output_device_combo.current()]
+            
+        # 绑定选择事件
+        self.input_device_combo.bind('<<ComboboxSelected>>', self.on_input_device_change)
+        self.output_device_combo.bind('<<ComboboxSelected>>', self.on_output_device_change)
+        
+        self.log_message(f"扫描完成：找到 {len(input_devices)} 个输入设备，{len(output_devices)} 个输出设备")
             
     def on_input_device_change(self, event):
         """输入设备改变"""
         selection = self.input_device_var.get()
         if selection:
-            # 从 "[0] Device Name" 格式中提取设备索引
-            device_index = int(selection.split(']')[0][1:])
-            self.selected_input_device = device_index
+            self.selected_input_device = self._input_indices[self.input_device_combo.current()]
             self.log_message(f"已选择输入设备: {selection}")
             # 保存到配置
             self.config_manager.set("last_input_device", selection)
@@ -265,51 +335,51 @@ class MainWindow:
         """输出设备改变"""
         selection = self.output_device_var.get()
         if selection:
-            # 从 "[0] Device Name" 格式中提取设备索引
-            device_index = int(selection.split(']')[0][1:])
-            self.selected_output_device = device_index
+            self.selected_output_device = self._output_indices[self.output_device_combo.current()]
             self.log_message(f"已选择输出设备: {selection}")
             # 保存到配置
             self.config_manager.set("last_output_device", selection)
             self.config_manager.save_config()
         
+    def _build_adapter_frames(self, parent) -> dict[str, ttk.Frame]:
+        """预先创建各适配器的专属配置区域，切换适配器时只显示/隐藏"""
+        self.proxy_url_var = tk.StringVar(value="ws://localhost:8765")
+        self.td_ip_var = tk.StringVar(value="localhost")
+        self.td_port_var = tk.StringVar(value="7000")
+        self.signaling_port_var = tk.StringVar(value="8080")
+        self.webrtc_port_var = tk.StringVar(value="8081")
+        
+        fields = {
+            "browser": [("代理URL:", self.proxy_url_var)],
+            "touchdesigner": [("TD IP:", self.td_ip_var), ("TD Port:", self.td_port_var)],
+            "touchdesigner-webrtc": [("信令端口:", self.signaling_port_var)],
+            "touchdesigner-webrtc-proper": [("信令端口:", self.signaling_port_var), ("WebRTC端口:", self.webrtc_port_var)],
+        }
+        
+        frames = {}
+        for adapter, rows in fields.items():
+            frame = ttk.Frame(parent)
+            for row, (label, var) in enumerate(rows):
+                ttk.Label(frame, text=label).grid(row=row, column=0, sticky=tk.W, pady=2)
+                ttk.Entry(frame, textvariable=var, width=40).grid(row=row, column=1, sticky=(tk.W, tk.E), pady=2)
+            frame.columnconfigure(1, weight=1)
+            frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N), pady=(10, 0))
+            frame.grid_remove()
+            frames[adapter] = frame
+        return frames
+        
     def on_adapter_change(self, event):
-        """适配器改变时更新动态配置"""
-        # 清空动态配置区域
-        for widget in self.dynamic_frame.winfo_children():
-            widget.destroy()
-            
+        """适配器改变时切换显示对应的配置区域"""
         adapter = self.adapter_var.get()
         
         # 保存适配器类型到配置
         self.config_manager.set("adapter_type", adapter)
         self.config_manager.save_config()
         
-        if adapter == "browser":
-            ttk.Label(self.dynamic_frame, text="代理URL:").grid(row=0, column=0, sticky=tk.W, pady=2)
-            self.proxy_url_var = tk.StringVar(value="ws://localhost:8765")
-            ttk.Entry(self.dynamic_frame, textvariable=self.proxy_url_var, width=40).grid(row=0, column=1, sticky=(tk.W, tk.E), pady=2)
-            
-        elif adapter == "touchdesigner":
-            ttk.Label(self.dynamic_frame, text="TD IP:").grid(row=0, column=0, sticky=tk.W, pady=2)
-            self.td_ip_var = tk.StringVar(value="localhost")
-            ttk.Entry(self.dynamic_frame, textvariable=self.td_ip_var, width=40).grid(row=0, column=1, sticky=(tk.W, tk.E), pady=2)
-            
-            ttk.Label(self.dynamic_frame, text="TD Port:").grid(row=1, column=0, sticky=tk.W, pady=2)
-            self.td_port_var = tk.StringVar(value="7000")
-            ttk.Entry(self.dynamic_frame, textvariable=self.td_port_var, width=40).grid(row=1, column=1, sticky=(tk.W, tk.E), pady=2)
-            
-        elif adapter in ["touchdesigner-webrtc", "touchdesigner-webrtc-proper"]:
-            ttk.Label(self.dynamic_frame, text="信令端口:").grid(row=0, column=0, sticky=tk.W, pady=2)
-            self.signaling_port_var = tk.StringVar(value="8080")
-            ttk.Entry(self.dynamic_frame, textvariable=self.signaling_port_var, width=40).grid(row=0, column=1, sticky=(tk.W, tk.E), pady=2)
-            
-            if adapter == "touchdesigner-webrtc-proper":
-                ttk.Label(self.dynamic_frame, text="WebRTC端口:").grid(row=1, column=0, sticky=tk.W, pady=2)
-                self.webrtc_port_var = tk.StringVar(value="8081")
-                ttk.Entry(self.dynamic_frame, textvariable=self.webrtc_port_var, width=40).grid(row=1, column=1, sticky=(tk.W, tk.E), pady=2)
-                
-        self.dynamic_frame.columnconfigure(1, weight=1)
+        for frame in self._adapter_frames.values():
+            frame.grid_remove()
+        if adapter in self._adapter_frames:
+            self._adapter_frames[adapter].grid()
     
     def on_bot_name_change(self, event):
         """机器人名称改变时保存配置"""
@@ -344,34 +414,19 @@ class MainWindow:
     def get_config(self):
         """获取当前配置"""
         adapter = self.adapter_var.get()
+        if adapter not in ADAPTER_NAMES:
+            raise ValueError(f"不支持的适配器类型: {adapter}")
+        adapter_type = ADAPTER_NAMES[adapter]
         
-        base_config = {
+        config = {
             "app_id": VOLCENGINE_APP_ID,
             "access_token": VOLCENGINE_ACCESS_TOKEN,
             "reconnect_timeout": float(self.reconnect_timeout_var.get()),
             "bot_name": self.bot_name_var.get()
         }
-        
-        if adapter == "local":
-            adapter_type = AdapterType.LOCAL
-            config = base_config
-        elif adapter == "browser":
-            adapter_type = AdapterType.BROWSER
-            config = {**base_config, "proxy_url": self.proxy_url_var.get()}
-        elif adapter == "touchdesigner":
-            adapter_type = AdapterType.TOUCH_DESIGNER
-            config = {**base_config, "td_ip": self.td_ip_var.get(), "td_port": int(self.td_port_var.get())}
-        elif adapter == "touchdesigner-webrtc":
-            adapter_type = AdapterType.TOUCH_DESIGNER_WEBRTC
-            config = {**base_config, "signaling_port": int(self.signaling_port_var.get())}
-        elif adapter == "touchdesigner-webrtc-proper":
-            adapter_type = AdapterType.TOUCH_DESIGNER_WEBRTC_PROPER
-            config = {**base_config, "signaling_port": int(self.signaling_port_var.get()), "webrtc_port": int(self.webrtc_port_var.get())}
-        elif adapter == "text-input":
-            adapter_type = AdapterType.TEXT_INPUT
-            config = base_config
-        else:
-            raise ValueError(f"不支持的适配器类型: {adapter}")
+        build = CONFIG_BUILDERS.get(adapter_type)
+        if build:
+            build(self, config)
             
         return adapter_type, config
         
@@ -394,7 +449,8 @@ class MainWindow:
             self.log_message(f"APP_ID: {config.get('app_id', 'NOT_SET')}")
             self.log_message(f"ACCESS_TOKEN: {config.get('access_token', 'NOT_SET')[:10]}...")
             
-            # 直接使用 UnifiedAudioApp，支持预选择设备
+            # 直接使用 UnifiedAudioApp，支持预选择设备（模块已在启动时由后台线程预加载）
+            from src.unified_app import UnifiedAudioApp
             self.app_instance = UnifiedAudioApp(
                 adapter_type, 
                 config, 
@@ -404,9 +460,9 @@ class MainWindow:
                 bot_name=config.get('bot_name', '小塔')
             )
             
-            # 在新线程中运行应用（使用 UnifiedAudioApp 的模式）
-            self.app_thread = threading.Thread(target=self.run_app_async, daemon=True)
-            self.app_thread.start()
+            # 提交到常驻事件循环中运行
+            self._future = asyncio.run_coroutine_threadsafe(self.app_instance.run(), self._loop)
+            self.root.after(100, self._poll_app_future, self._future)
             
             self.is_running = True
             self.start_button.config(state=tk.DISABLED)
@@ -419,18 +475,17 @@ class MainWindow:
             messagebox.showerror("错误", f"启动失败: {str(e)}")
             self.log_message(f"启动失败: {str(e)}")
             
-    def run_app_async(self):
-        """异步运行应用"""
-        try:
-            # 直接使用 UnifiedAudioApp 的 run 方法
-            asyncio.run(self.app_instance.run())
-        except Exception as e:
-            self.log_message(f"应用运行错误: {str(e)}")
-        finally:
-            self.root.after(0, self.on_app_stopped)
+    def _poll_app_future(self, future: concurrent.futures.Future):
+        """主线程轮询应用协程是否结束，不从事件循环线程调用 Tk"""
+        if not future.done():
+            self.root.after(100, self._poll_app_future, future)
+            return
+        if not future.cancelled() and future.exception():
+            self.log_message(f"应用运行错误: {str(future.exception())}")
+        self.on_app_stopped()
             
     def stop_app(self):
-        """停止应用"""
+        """停止应用，不阻塞界面；应用结束后由 _poll_app_future 更新状态"""
         if not self.is_running:
             return
             
@@ -438,14 +493,18 @@ class MainWindow:
         self.status_var.set("停止中...")
         self.log_message("正在停止应用...")
         
-        # 停止 UnifiedAudioApp
+        # 通知 UnifiedAudioApp 协作退出
         if self.app_instance:
-            if hasattr(self.app_instance, 'stop_event'):
-                self.app_instance.stop_event.set()
+            self.app_instance.stop_event.set()
         
-        # 等待线程结束
-        if hasattr(self, 'app_thread') and self.app_thread.is_alive():
-            self.app_thread.join(timeout=5.0)
+        # 5秒内未退出则取消应用协程
+        self.root.after(5000, self._cancel_app, self._future)
+
+    def _cancel_app(self, future: concurrent.futures.Future):
+        """取消仍未结束的应用协程"""
+        if not future.done():
+            self.log_message("应用未能及时停止，强制取消")
+            future.cancel()
             
     def on_app_stopped(self):
         """应用停止时的回调"""
@@ -469,4 +528,10 @@ class MainWindow:
         
         if self.is_running:
             self.stop_app()
+            # 窗口即将关闭，等待应用完成清理后再停止事件循环
+            concurrent.futures.wait([self._future], timeout=5.0)
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        logging.getLogger().removeHandler(self._queue_handler)
+        self._queue_listener.stop()
         self.root.destroy()
\ No newline at end of file
@@ -4,6 +4,7 @@ GUI主程序入口
 """
 import sys
 import os
+import threading
 import tkinter as tk
 from tkinter import messagebox
 
@@ -13,8 +14,17 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import dotenv
 dotenv.load_dotenv()
 
+def _preload_app_modules():
+    """预加载 UnifiedAudioApp 模块，导入失败留到启动应用时再报告"""
+    try:
+        import src.unified_app  # noqa: F401
+    except ImportError:
+        pass
+
 def main():
     """GUI主函数"""
+    # 在后台预加载音频应用模块，与窗口构建并行；启动时直接从 sys.modules 取用
+    threading.Thread(target=_preload_app_modules, daemon=True).start()
     try:
         from gui.main_window import MainWindow
         app = MainWindow()
@@ -22,7 +32,7 @@ def main():
     except Exception as e:
         try:
             messagebox.showerror("错误", f"应用启动失败: {str(e)}")
-        except:
+        except tk.TclError:  # 没有可用的显示环境时退回到终端输出
             print(f"应用启动失败: {str(e)}")
         sys.exit(1)
 
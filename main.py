@@ -1,22 +1,32 @@
 import argparse
 import asyncio
+from typing import Callable
 
 import dotenv
 
 dotenv.load_dotenv()
 
-from src.adapters.type import AdapterType
+from src.adapters.type import AdapterType, ADAPTER_NAMES
 from src.config import VOLCENGINE_APP_ID, VOLCENGINE_ACCESS_TOKEN
 from src.unified_app import UnifiedAudioApp
 from logger import logger
 
+# 适配器类型 -> 从命令行参数中取出该适配器专属配置的函数（没有专属配置的适配器不列出）
+CONFIG_BUILDERS: dict[AdapterType, Callable[[argparse.Namespace], dict]] = {
+    AdapterType.BROWSER: lambda args: {"proxy_url": args.proxy_url},
+    AdapterType.TOUCH_DESIGNER: lambda args: {"td_ip": args.td_ip, "td_port": args.td_port},
+    AdapterType.TOUCH_DESIGNER_WEBRTC: lambda args: {"signaling_port": args.signaling_port},
+    AdapterType.TOUCH_DESIGNER_WEBRTC_PROPER: lambda args: {
+        "signaling_port": args.signaling_port, "webrtc_port": args.webrtc_port},
+    }
+
 
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description="统一音频应用")
     parser.add_argument(
         "--adapter", 
-        choices=["local", "browser", "touchdesigner", "touchdesigner-webrtc", "touchdesigner-webrtc-proper", "text-input"], 
+        choices=list(ADAPTER_NAMES), 
         default="local", 
         help="选择适配器类型"
         )
@@ -48,57 +58,14 @@ def main():
         print("默认使用PCM模式请求TTS音频")
 
     # 确定适配器类型
-    if args.adapter == "local":
-        adapter_type = AdapterType.LOCAL
-        config = {
-            "app_id": VOLCENGINE_APP_ID,
-            "access_token": VOLCENGINE_ACCESS_TOKEN,
-            "reconnect_timeout": args.reconnect_timeout
-            }
-    elif args.adapter == "browser":
-        adapter_type = AdapterType.BROWSER
-        config = {
-            "proxy_url": args.proxy_url,
-            "app_id": VOLCENGINE_APP_ID,
-            "access_token": VOLCENGINE_ACCESS_TOKEN,
-            "reconnect_timeout": args.reconnect_timeout
-            }
-    elif args.adapter == "touchdesigner":
-        adapter_type = AdapterType.TOUCH_DESIGNER
-        config = {
-            "td_ip": args.td_ip,
-            "td_port": args.td_port,
-            "app_id": VOLCENGINE_APP_ID,
-            "access_token": VOLCENGINE_ACCESS_TOKEN,
-            "reconnect_timeout": args.reconnect_timeout
-            }
-    elif args.adapter == "touchdesigner-webrtc":
-        adapter_type = AdapterType.TOUCH_DESIGNER_WEBRTC
-        config = {
-            "signaling_port": args.signaling_port,
-            "app_id": VOLCENGINE_APP_ID,
-            "access_token": VOLCENGINE_ACCESS_TOKEN,
-            "reconnect_timeout": args.reconnect_timeout
-            }
-    elif args.adapter == "touchdesigner-webrtc-proper":
-        adapter_type = AdapterType.TOUCH_DESIGNER_WEBRTC_PROPER
-        config = {
-            "signaling_port": args.signaling_port,
-            "webrtc_port": args.webrtc_port,
-            "app_id": VOLCENGINE_APP_ID,
-            "access_token": VOLCENGINE_ACCESS_TOKEN,
-            "reconnect_timeout": args.reconnect_timeout
-            }
-    elif args.adapter == "text-input":
-        adapter_type = AdapterType.TEXT_INPUT
-        config = {
-            "app_id": VOLCENGINE_APP_ID,
-            "access_token": VOLCENGINE_ACCESS_TOKEN,
-            "reconnect_timeout": args.reconnect_timeout
-            }
-    else:
-        logger.error(f"不支持的适配器类型: {args.adapter}")
-        return
+    adapter_type = ADAPTER_NAMES[args.adapter]
+    build = CONFIG_BUILDERS.get(adapter_type)
+    config = build(args) if build else {}
+    config.update(
+        app_id=VOLCENGINE_APP_ID,
+        access_token=VOLCENGINE_ACCESS_TOKEN,
+        reconnect_timeout=args.reconnect_timeout,
+        )
 
     # 创建应用
     app = UnifiedAudioApp(adapter_type, config, use_tts_pcm=args.use_pcm)
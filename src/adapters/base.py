@@ -1,4 +1,3 @@
-import queue
 import threading
 from abc import ABC, abstractmethod
 from typing import Dict, Any, AsyncGenerator, Optional
@@ -73,12 +72,12 @@ class AudioAdapter(ABC):
         """设置音频设备，返回(recorder_thread, player_thread)"""
         return None, None
 
-    async def run_sender_task(self, send_queue: queue.Queue, stop_event: threading.Event) -> None:
-        """运行发送任务"""
+    async def run_sender_task(self, send_queue: Any, stop_event: threading.Event) -> None:
+        """运行发送任务，send_queue 为 setup_audio_devices 中创建的 _send_queue，具体类型由适配器决定"""
         pass
 
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
-        """运行接收任务"""
+    async def run_receiver_task(self, play_queue: Any, stop_event: threading.Event) -> None:
+        """运行接收任务，play_queue 为 setup_audio_devices 中创建的 _play_queue，具体类型由适配器决定"""
         pass
 
 
@@ -1,9 +1,8 @@
 import asyncio
 import json
 import logging
-import queue
 import threading
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional
 
 import websockets
 
@@ -23,7 +22,6 @@ class BrowserAudioAdapter(AudioAdapter):
         self.audio_queue = asyncio.Queue()
         self._receiver_task = None
         self.proxy_server = None
-        self.server_task = None
         self._send_queue = None
         self._play_queue = None
 
@@ -38,10 +36,7 @@ class BrowserAudioAdapter(AudioAdapter):
 
             # 启动内嵌代理服务器
             self.proxy_server = ProxyServer(proxy_url, self.bot_name)
-            self.server_task = asyncio.create_task(self.proxy_server.start())
-
-            # 等待服务器启动
-            await asyncio.sleep(0.5)
+            await self.proxy_server.start()
             
             self.is_connected = True
             logger.info(f"代理服务器已启动，等待浏览器连接: {proxy_url}")
@@ -67,13 +62,6 @@ class BrowserAudioAdapter(AudioAdapter):
         if self.proxy_server:
             await self.proxy_server.stop()
 
-        if self.server_task:
-            self.server_task.cancel()
-            try:
-                await self.server_task
-            except asyncio.CancelledError:
-                pass
-
         self.is_connected = False
         logger.info("浏览器适配器已断开连接")
 
@@ -97,10 +85,10 @@ class BrowserAudioAdapter(AudioAdapter):
         """接收音频数据流"""
         while self.is_connected:
             try:
-                audio_data = await asyncio.wait_for(self.audio_queue.get(), timeout=1.0)
+                audio_data = await self.audio_queue.get()
+                if audio_data is None:  # 发送任务或接收任务已结束
+                    break
                 yield audio_data
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收音频失败: {e}")
                 break
@@ -126,13 +114,13 @@ class BrowserAudioAdapter(AudioAdapter):
         while self.is_connected and self.ws:
             try:
                 message = await self.ws.recv()
-                logger.debug(f"收到数据: {len(message)}字节, type: {type(message)}")
+                logger.debug("收到数据: %d字节, type: %s", len(message), type(message))
 
                 # 检查消息类型：二进制数据（音频）或文本数据（JSON）
                 if isinstance(message, bytes):
                     # 二进制音频数据，直接放入队列
                     await self.audio_queue.put(message)
-                    logger.debug(f"收到二进制音频数据: {len(message)}字节")
+                    logger.debug("收到二进制音频数据: %d字节", len(message))
                 else:
                     # 文本消息，解析为JSON
                     try:
@@ -156,7 +144,7 @@ class BrowserAudioAdapter(AudioAdapter):
         logger.info("Browser模式：音频通过WebSocket传输，跳过系统音频设备选择")
         return None, None
 
-    async def run_sender_task(self, send_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_sender_task(self, send_queue: Any, stop_event: threading.Event) -> None:
         """Browser发送任务 - 等待浏览器音频数据"""
         logger.info("Browser发送任务启动，等待浏览器音频数据")
 
@@ -172,42 +160,26 @@ class BrowserAudioAdapter(AudioAdapter):
         except Exception as e:
             logger.error(f"Browser发送任务异常: {e}")
 
+        # 唤醒接收任务退出
+        self.audio_queue.put_nowait(None)
         logger.info("Browser发送任务结束")
 
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_receiver_task(self, play_queue: Any, stop_event: threading.Event) -> None:
         """Browser接收任务"""
         logger.info("Browser接收任务启动")
         received_count = 0
 
         try:
             async for audio_data in self.receive_audio():
-                logger.debug(f"收到音频数据: {len(audio_data)} bytes")
                 if stop_event.is_set():
                     break
 
                 received_count += 1
-                logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
+                if received_count % 100 == 0:
+                    logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
 
                 # Browser模式下，音频数据通过WebSocket直接转发给浏览器
                 # 不需要放入播放队列，因为没有本地播放设备
-                if play_queue is not None:
-                    try:
-                        play_queue.put_nowait(
-                            {
-                                "payload_msg": audio_data
-                                }
-                            )
-                    except queue.Full:
-                        # 播放队列满时，移除最老的数据再放入新数据
-                        try:
-                            play_queue.get_nowait()
-                            play_queue.put_nowait(
-                                {
-                                    "payload_msg": audio_data
-                                    }
-                                )
-                        except queue.Empty:
-                            pass
 
         except Exception as e:
             logger.error(f"Browser接收任务异常: {e}")
@@ -1,23 +1,34 @@
-import uuid
 import asyncio
+import contextlib
 import logging
 import threading
-import queue
 import json
-import sys
-from typing import Dict, Any, AsyncGenerator, Optional
+from typing import AsyncGenerator, Optional
 
 from src.adapters.base import AudioAdapter, LocalConnectionConfig
 from src.adapters.type import AdapterType
 from src.volcengine.client import VolcengineClient
 from src.volcengine import protocol
+from src.audio.ogg_decoder import OggOpusDecoder
+from src.audio.ring_buffer import PcmRingBuffer
 from src.audio.threads import recorder_thread, player_thread
 from src.audio.utils.select_audio_device import select_audio_device
 from src.audio.utils.voice_activity_detector import VoiceActivityDetector
 from src.volcengine.config import ws_connect_config
+from src.constants import VOLCENGINE_RECV_PCM_AUDIO_SAMPLE_RATE
 
 logger = logging.getLogger(__name__)
 
+# 麦克风待发送队列上限（每块100ms），网络卡顿时丢弃最旧的音频，避免延迟持续增长
+_SEND_QUEUE_MAXSIZE = 8
+
+
+def _put_latest(q: asyncio.Queue, item: Optional[bytes]) -> None:
+    """放入队列，队列已满时先丢弃最旧的一块"""
+    if q.full():
+        q.get_nowait()
+    q.put_nowait(item)
+
 
 def text_input_thread(adapter, stop_event: threading.Event, loop):
     """文字输入线程"""
@@ -72,6 +83,8 @@ class LocalAudioAdapter(AudioAdapter):
         self.response_queue = asyncio.Queue()
         self._receiver_task = None
         self._text_input_thread = None
+        # 未请求PCM时服务端返回OGG/Opus，需本地解码
+        self._ogg_decoder: Optional[OggOpusDecoder] = None
         # 支持预选择的设备索引（GUI模式）
         self.input_device_index = input_device_index
         self.output_device_index = output_device_index
@@ -115,8 +128,11 @@ class LocalAudioAdapter(AudioAdapter):
                 await self._receiver_task
             except asyncio.CancelledError:
                 pass
-        
-        
+
+        if self._ogg_decoder:
+            self._ogg_decoder.close()
+            self._ogg_decoder = None
+
         if self.client:
             await self.client.stop()
             self.client = None
@@ -140,13 +156,13 @@ class LocalAudioAdapter(AudioAdapter):
         """接收音频数据流"""
         while self.is_connected:
             try:
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或接收任务已结束
+                    break
                 if response.get('event') == protocol.ServerEvent.TTS_RESPONSE:
                     audio_data = response.get('payload_msg')
                     if isinstance(audio_data, bytes):
                         yield audio_data
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收音频失败: {e}")
                 break
@@ -212,6 +228,7 @@ class LocalAudioAdapter(AudioAdapter):
     
     async def setup_audio_devices(self, p, stop_event: threading.Event) -> tuple[Optional[threading.Thread], Optional[threading.Thread]]:
         """设置音频设备"""
+        loop = asyncio.get_running_loop()
         try:
             # 检查是否已经预选择了设备（GUI模式）
             if self.input_device_index is not None and self.output_device_index is not None:
@@ -222,7 +239,6 @@ class LocalAudioAdapter(AudioAdapter):
                 # CLI模式：在单独线程中选择设备，避免阻塞事件循环
                 import concurrent.futures
                 
-                loop = asyncio.get_event_loop()
                 with concurrent.futures.ThreadPoolExecutor() as executor:
                     # 选择输入设备
                     input_device_index = await loop.run_in_executor(
@@ -240,19 +256,31 @@ class LocalAudioAdapter(AudioAdapter):
 
             # 启动录音和播放线程，使用更大的chunk_size
             chunk_size = 1600  # 使用1600帧，约100ms的音频
-            send_queue = queue.Queue()
-            play_queue = queue.Queue()
-            
+            # 录音线程直接投递到事件循环，发送任务无需轮询
+            send_queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=_SEND_QUEUE_MAXSIZE)
+
+            def on_audio(data: Optional[bytes]) -> None:
+                # 事件循环关闭后丢弃数据，避免录音线程在退出时抛出异常
+                with contextlib.suppress(RuntimeError):
+                    loop.call_soon_threadsafe(_put_latest, send_queue, data)
+            # 缓冲60秒TTS音频，服务端生成速度快于实时播放
+            play_queue = PcmRingBuffer(VOLCENGINE_RECV_PCM_AUDIO_SAMPLE_RATE * 60)
+
+            if self.tts_config is None:
+                self._ogg_decoder = OggOpusDecoder(play_queue.write, play_queue.clear)
+                self._ogg_decoder.start()
+
             player = threading.Thread(
                 target=player_thread, args=(p, output_device_index, play_queue, chunk_size, stop_event)
             )
             recorder = threading.Thread(
-                target=recorder_thread, args=(p, input_device_index, send_queue, chunk_size, stop_event)
+                target=recorder_thread,
+                args=(p, input_device_index, on_audio, chunk_size, stop_event)
             )
 
             # 启动文字输入线程（仅CLI模式）
             if self.input_device_index is None:  # CLI模式
-                current_loop = asyncio.get_event_loop()
+                current_loop = loop
                 # text_input = threading.Thread(
                 #     target=text_input_thread, args=(self, stop_event, current_loop)
                 # )
@@ -274,7 +302,7 @@ class LocalAudioAdapter(AudioAdapter):
             logger.error(f"音频设备设置失败: {e}")
             return None, None
 
-    async def run_sender_task(self, send_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_sender_task(self, send_queue: asyncio.Queue, stop_event: threading.Event) -> None:
         """运行发送任务"""
         logger.info("发送任务启动，启用语音活动检测")
         audio_count = 0
@@ -287,8 +315,9 @@ class LocalAudioAdapter(AudioAdapter):
 
         while not stop_event.is_set() and self.is_connected:
             try:
-                # 更短的超时，保证实时性
-                audio_chunk = await asyncio.to_thread(send_queue.get, timeout=0.2)
+                audio_chunk = await send_queue.get()
+                if audio_chunk is None:  # 录音线程已停止
+                    break
                 audio_count += 1
 
                 # 检测语音活动
@@ -301,9 +330,9 @@ class LocalAudioAdapter(AudioAdapter):
                         sent_count += 1
                         failed_count = 0  # 重置失败计数
 
-                        # 显示音量指示 - 减少输出频率
-                        volume = vad.get_volume(audio_chunk)
+                        # 显示音量指示 - 减少输出频率，仅在输出时计算音量
                         if sent_count % 100 == 0:  # 每100个包显示一次，减少日志输出
+                            volume = vad.get_volume(audio_chunk)
                             logger.info(f"🎤 发送语音 #{sent_count}, 音量: {volume:.3f}")
                     else:
                         failed_count += 1
@@ -317,55 +346,54 @@ class LocalAudioAdapter(AudioAdapter):
                         volume = vad.get_volume(audio_chunk)
                         logger.debug(f"🔇 静音检测中... 音量: {volume:.3f}")
 
-            except queue.Empty:
-                # 短暂等待，避免占用过多CPU
-                await asyncio.sleep(0.01)
-                continue
             except Exception as e:
                 logger.error(f"发送任务异常: {e}")
                 break
 
+        # 唤醒接收任务退出
+        self.response_queue.put_nowait(None)
         logger.info(f"发送任务结束，处理 {audio_count} 个音频包，实际发送 {sent_count} 个")
 
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_receiver_task(self, play_queue: PcmRingBuffer, stop_event: threading.Event) -> None:
         """运行接收任务"""
         logger.info("接收任务启动")
         
         while self.is_connected and not stop_event.is_set():
             try:
                 # 从适配器的响应队列获取数据
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
-                if not response or "error" in response:
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或响应接收任务已结束
+                    break
+                if "error" in response:
                     continue
 
                 event = response.get('event')
                 if event == protocol.ServerEvent.TTS_RESPONSE:
                     # 音频响应 - 优化队列处理，减少日志输出
                     audio_data = response.get('payload_msg')
-                    logger.debug(f"收到TTS音频数据: {type(audio_data)}, 大小: {len(audio_data) if isinstance(audio_data, bytes) else 'N/A'}")
-                    # 避免满
-                    if play_queue.full():
-                        play_queue.get_nowait()
-                    play_queue.put_nowait(response)
+                    if self._ogg_decoder:
+                        self._ogg_decoder.feed(audio_data)
+                    elif not play_queue.write(audio_data):
+                        logger.warning("播放缓冲区已满，丢弃最旧的音频数据")
 
                 # interrupt speaking
                 elif event == protocol.ServerEvent.ASR_INFO:
-                    while not play_queue.empty():
-                        play_queue.get_nowait()
-                elif event:
-                    # 其他事件，友好显示
-                    try:
-                        event_name = protocol.ServerEvent(event).name
-                        payload = response.get('payload_msg', {})
-                        if isinstance(payload, dict):
-                            logger.info(f"收到事件: {event_name} - {json.dumps(payload, ensure_ascii=False)}")
-                        else:
-                            logger.info(f"收到事件: {event_name}")
-                    except ValueError:
-                        logger.info(f"收到未知事件: {event}")
-
-            except asyncio.TimeoutError:
-                continue
+                    # OGG模式下缓冲区由解码线程写入，清空也交给解码线程，保持单生产者
+                    if self._ogg_decoder:
+                        self._ogg_decoder.reset()
+                    else:
+                        play_queue.clear()
+                elif event and logger.isEnabledFor(logging.INFO):
+                    # 其他事件，友好显示（日志关闭时跳过事件名查找和json序列化）
+                    event_name = protocol.SERVER_EVENT_NAMES.get(event)
+                    payload = response.get('payload_msg', {})
+                    if event_name is None:
+                        logger.info("收到未知事件: %s", event)
+                    elif isinstance(payload, dict):
+                        logger.info("收到事件: %s - %s", event_name, json.dumps(payload, ensure_ascii=False))
+                    else:
+                        logger.info("收到事件: %s", event_name)
+
             except Exception as e:
                 logger.error(f"接收响应失败: {e}")
                 break
@@ -380,3 +408,5 @@ class LocalAudioAdapter(AudioAdapter):
             except Exception as e:
                 logger.error(f"接收响应失败: {e}")
                 break
+        # 通知接收任务退出
+        self.response_queue.put_nowait(None)
@@ -22,6 +22,12 @@ class ProxyClient:
         self.running = True
         self.bot_name = bot_name
         self.welcome_message = f"你好，我是{self.bot_name}，今天很高兴遇见你~"
+        self._handlers = {
+            "audio": self._handle_audio,
+            "text": self._handle_text,
+            "chat_tts_text": self._handle_chat_tts_text,
+            "ping": self._handle_ping,
+            }
 
     async def handle(self):
         """处理客户端消息"""
@@ -48,21 +54,19 @@ class ProxyClient:
     async def _handle_message(self, data: Dict[str, Any]):
         """处理具体消息"""
         message_type = data.get("type")
-
-        if message_type == "audio":
-            await self._handle_audio(data)
-        elif message_type == "text":
-            await self._handle_text(data)
-        elif message_type == "chat_tts_text":
-            await self._handle_chat_tts_text(data)
-        elif message_type == "ping":
-            await self._send_message(
-                {
-                    "type": "pong"
-                    }
-                )
-        else:
+        handler = self._handlers.get(message_type)
+        if handler is None:
             await self._send_error(f"Unknown message type: {message_type}")
+            return
+        await handler(data)
+
+    async def _handle_ping(self, data: Dict[str, Any]):
+        """处理心跳消息"""
+        await self._send_message(
+            {
+                "type": "pong"
+                }
+            )
 
     async def _init_volcengine_client(self):
         """初始化火山引擎客户端"""
@@ -171,7 +175,7 @@ class ProxyClient:
 
     async def _send_audio_binary(self, audio_data: bytes):
         """直接发送二进制音频数据"""
-        logger.debug(f"sending audio binary (size={len(audio_data)})")
+        logger.debug("sending audio binary (size=%d)", len(audio_data))
         await self.websocket.send(audio_data)
 
     async def _send_error(self, error_message: str):
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import uuid
 from typing import Dict
@@ -23,7 +22,7 @@ class ProxyServer:
         self.bot_name = bot_name
 
     async def start(self):
-        """启动代理服务器"""
+        """启动代理服务器，开始监听后立即返回，由 stop() 关闭"""
         logger.info(f"启动代理服务器 ws://{self.host}:{self.port}")
 
         # 兼容新版本websockets库的处理方法
@@ -31,11 +30,6 @@ class ProxyServer:
             return await self.handle_client(websocket)
 
         self.server = await websockets.serve(handler, self.host, self.port)
-        try:
-            await self.server.wait_closed()
-        except asyncio.CancelledError:
-            logger.info("代理服务器已被取消")
-            await self.stop()
 
     async def stop(self):
         """停止代理服务器"""
@@ -50,9 +44,6 @@ class ProxyServer:
         logger.info(f"新客户端连接: {client_id}")
 
         proxy_client = ProxyClient(client_id, websocket, self.bot_name)
-        # 传递配置给ProxyClient
-        if hasattr(self, 'config'):
-            proxy_client.config = self.config
         self.clients[client_id] = proxy_client
 
         try:
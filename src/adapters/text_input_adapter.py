@@ -1,18 +1,21 @@
 import asyncio
+import contextlib
 import json
 import logging
 import queue
+import sys
 import threading
-import numpy as np
 from typing import AsyncGenerator, Optional
 
 from src.adapters.base import AudioAdapter, LocalConnectionConfig
 from src.adapters.type import AdapterType
+from src.audio.ring_buffer import PcmRingBuffer
 from src.audio.threads import player_thread
 from src.audio.utils.select_audio_device import select_audio_device
 from src.volcengine import protocol
 from src.volcengine.client import VolcengineClient
 from src.volcengine.config import ws_connect_config
+from src.constants import VOLCENGINE_RECV_PCM_AUDIO_SAMPLE_RATE
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +29,10 @@ class TextInputAdapter(AudioAdapter):
         self.response_queue = asyncio.Queue()
         self._receiver_task = None
         self._input_task = None
+        self._stdin_lines: Optional[asyncio.Queue] = None
         self._send_queue = None
         self._play_queue = None
-        self._server_activated = False
+        self._server_activated = asyncio.Event()
     
     @property
     def adapter_type(self) -> AdapterType:
@@ -60,22 +64,13 @@ class TextInputAdapter(AudioAdapter):
     async def _send_silence_to_activate(self):
         """发送静音音频激活服务器"""
         try:
-            # 生成1秒的静音音频 (16kHz, 16位PCM)
-            sample_rate = 16000
-            duration = 1.0  # 1秒
-            samples = int(sample_rate * duration)
-            
-            # 生成静音数据 (16位PCM，小端字节序)
-            silence = np.zeros(samples, dtype=np.int16)
-            silence_bytes = silence.tobytes()
-            
             logger.info("发送静音音频以激活服务器...")
-            await self.client.push_audio(silence_bytes)
+            await self.client.push_audio(self.client.generate_silence_audio(1000))  # 1秒静音
             logger.info("静音音频发送完成")
             
             # 稍微等待服务器响应
             await asyncio.sleep(0.5)
-            self._server_activated = True
+            self._server_activated.set()
             logger.info("服务器已激活，可以使用ChatTTS接口")
             
         except Exception as e:
@@ -112,13 +107,13 @@ class TextInputAdapter(AudioAdapter):
         """接收音频数据流"""
         while self.is_connected:
             try:
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或接收任务已结束
+                    break
                 if response.get('event') == protocol.ServerEvent.TTS_RESPONSE:
                     audio_data = response.get('payload_msg')
                     if isinstance(audio_data, bytes):
                         yield audio_data
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收音频失败: {e}")
                 break
@@ -129,14 +124,11 @@ class TextInputAdapter(AudioAdapter):
             return False
         
         # 等待服务器激活
-        if not self._server_activated:
+        if not self._server_activated.is_set():
             logger.warning("服务器尚未激活，等待激活...")
-            for _ in range(10):  # 最多等待5秒
-                if self._server_activated:
-                    break
-                await asyncio.sleep(0.5)
-            
-            if not self._server_activated:
+            try:
+                await asyncio.wait_for(self._server_activated.wait(), timeout=5.0)
+            except asyncio.TimeoutError:
                 logger.error("服务器激活超时，无法发送ChatTTS文本")
                 return False
         
@@ -165,7 +157,7 @@ class TextInputAdapter(AudioAdapter):
                 return None, None
             
             chunk_size = 1600
-            play_queue = queue.Queue()
+            play_queue = PcmRingBuffer(VOLCENGINE_RECV_PCM_AUDIO_SAMPLE_RATE * 60)
             
             player = threading.Thread(
                 target=player_thread, args=(p, output_device_index, play_queue, chunk_size, stop_event)
@@ -199,14 +191,15 @@ class TextInputAdapter(AudioAdapter):
         except asyncio.CancelledError:
             pass
         
+        # 唤醒接收任务退出
+        self.response_queue.put_nowait(None)
         logger.info("文字输入任务结束")
     
     async def _handle_text_input(self, stop_event: threading.Event):
         """处理文字输入的协程"""
         while not stop_event.is_set() and self.is_connected:
             try:
-                # 使用 asyncio.to_thread 在线程中执行 input()
-                user_input = await asyncio.to_thread(input, "💬 请输入文字: ")
+                user_input = await self._read_line("💬 请输入文字: ")
                 
                 if user_input.lower() in ['quit', 'exit', 'q']:
                     logger.info("用户请求退出")
@@ -223,40 +216,67 @@ class TextInputAdapter(AudioAdapter):
                 logger.error(f"处理文字输入异常: {e}")
                 break
     
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def _read_line(self, prompt: str) -> str:
+        """读取一行用户输入；等待期间可被取消"""
+        if self._stdin_lines is None:
+            self._stdin_lines = asyncio.Queue()
+            threading.Thread(
+                target=self._stdin_reader, args=(asyncio.get_running_loop(), self._stdin_lines), daemon=True
+                ).start()
+        sys.stdout.write(prompt)
+        sys.stdout.flush()
+        line = await self._stdin_lines.get()
+        if isinstance(line, Exception):  # 标准输入已关闭或不可用（如无控制台的GUI打包版本）
+            raise line
+        return line
+
+    @staticmethod
+    def _stdin_reader(loop: asyncio.AbstractEventLoop, lines: asyncio.Queue) -> None:
+        """守护线程：用 input() 逐行读取标准输入（按控制台编码解码），读取失败时把异常交给事件循环后退出"""
+        while True:
+            try:
+                item = input()
+            except Exception as e:  # EOFError，或 sys.stdin 为 None 时的 RuntimeError
+                item = e
+            with contextlib.suppress(RuntimeError):  # 事件循环已关闭
+                loop.call_soon_threadsafe(lines.put_nowait, item)
+            if isinstance(item, Exception):
+                return
+    
+    async def run_receiver_task(self, play_queue: PcmRingBuffer, stop_event: threading.Event) -> None:
         """运行接收任务"""
         logger.info("接收任务启动")
         received_count = 0
         
         while self.is_connected and not stop_event.is_set():
             try:
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
-                if not response or "error" in response:
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或响应接收任务已结束
+                    break
+                if "error" in response:
                     continue
                 
                 event = response.get('event')
                 if event == protocol.ServerEvent.TTS_RESPONSE:
                     audio_data = response.get('payload_msg')
                     received_count += 1
-                    logger.info(f"收到TTS音频数据 #{received_count}: {type(audio_data)}, 大小: {len(audio_data) if isinstance(audio_data, bytes) else 'N/A'}")
+                    logger.info("收到TTS音频数据 #%d: %s, 大小: %s", received_count, type(audio_data),
+                                len(audio_data) if isinstance(audio_data, bytes) else 'N/A')
                     
-                    if play_queue.full():
-                        play_queue.get_nowait()
-                    play_queue.put_nowait(response)
+                    if isinstance(audio_data, bytes) and not play_queue.write(audio_data):
+                        logger.warning("播放缓冲区已满，丢弃最旧的音频数据")
                 
-                elif event:
-                    try:
-                        event_name = protocol.ServerEvent(event).name
-                        payload = response.get('payload_msg', {})
-                        if isinstance(payload, dict):
-                            logger.info(f"收到事件: {event_name} - {json.dumps(payload, ensure_ascii=False)}")
-                        else:
-                            logger.info(f"收到事件: {event_name}")
-                    except ValueError:
-                        logger.info(f"收到未知事件: {event}")
+                elif event and logger.isEnabledFor(logging.INFO):
+                    # 日志关闭时跳过事件名查找和json序列化
+                    event_name = protocol.SERVER_EVENT_NAMES.get(event)
+                    payload = response.get('payload_msg', {})
+                    if event_name is None:
+                        logger.info("收到未知事件: %s", event)
+                    elif isinstance(payload, dict):
+                        logger.info("收到事件: %s - %s", event_name, json.dumps(payload, ensure_ascii=False))
+                    else:
+                        logger.info("收到事件: %s", event_name)
             
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收响应失败: {e}")
                 break
@@ -271,3 +291,5 @@ class TextInputAdapter(AudioAdapter):
             except Exception as e:
                 logger.error(f"接收响应失败: {e}")
                 break
+        # 通知接收任务退出
+        self.response_queue.put_nowait(None)
@@ -1,10 +1,11 @@
 import asyncio
+import collections
 import logging
 import socket
 import struct
 import threading
 import queue
-from typing import AsyncGenerator, Optional
+from typing import Any, AsyncGenerator, Optional
 
 from src.adapters.base import AudioAdapter, ConnectionConfig
 from src.adapters.type import AdapterType
@@ -14,6 +15,12 @@ from src.volcengine.config import ws_connect_config
 
 logger = logging.getLogger(__name__)
 
+# UDP包头: [4字节长度][4字节类型]；分片包额外带 [2字节chunk_id][2字节total_chunks]
+_HEADER = struct.Struct('<II')
+_CHUNK_HEADER = struct.Struct('<IIHH')
+# 内核UDP缓冲区大小，避免事件循环短暂繁忙时丢包
+_SOCKET_BUFFER_SIZE = 2 * 1024 * 1024
+
 
 class TouchDesignerConnectionConfig(ConnectionConfig):
     """TouchDesigner连接配置"""
@@ -47,6 +54,12 @@ class TouchDesignerAudioAdapter(AudioAdapter):
         self.udp_socket = None
         self.listen_socket = None
         self._udp_listener_task = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_status_event = None
+
+        # 队列初始化（兼容UnifiedAudioApp）
+        self._send_queue = None
+        self._play_queue = None
 
         # 音频格式配置 (根据豆包要求: 16kHz, 16-bit, mono)
         self.sample_rate = 16000
@@ -88,11 +101,16 @@ class TouchDesignerAudioAdapter(AudioAdapter):
 
     async def _setup_udp_communication(self):
         """设置UDP通信"""
+        self._loop = asyncio.get_running_loop()
+
         # 创建发送socket (发送音频到TD)
         self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SOCKET_BUFFER_SIZE)
+        self.udp_socket.setblocking(False)
 
         # 创建监听socket (接收TD的音频)
         self.listen_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_BUFFER_SIZE)
         self.listen_socket.bind(('0.0.0.0', self.listen_port))
         self.listen_socket.setblocking(False)
 
@@ -108,13 +126,11 @@ class TouchDesignerAudioAdapter(AudioAdapter):
         while self.is_connected:
             try:
                 # 非阻塞接收UDP数据
-                loop = asyncio.get_event_loop()
-                data, addr = await loop.sock_recvfrom(self.listen_socket, 4096)
+                data, addr = await self._loop.sock_recvfrom(self.listen_socket, 4096)
 
                 if len(data) > 8:  # 至少要有头部信息
                     # 解析音频数据包格式: [4字节长度][4字节类型][音频数据]
-                    length = struct.unpack('<I', data[:4])[0]
-                    msg_type = struct.unpack('<I', data[4:8])[0]
+                    length, msg_type = _HEADER.unpack_from(data)
 
                     if msg_type == 1:  # 音频数据类型
                         audio_data = data[8:8 + length]
@@ -183,15 +199,15 @@ class TouchDesignerAudioAdapter(AudioAdapter):
         """接收来自豆包的音频数据流"""
         while self.is_connected:
             try:
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或接收任务已结束
+                    break
                 if response.get('event') == protocol.ServerEvent.TTS_RESPONSE:
                     audio_data = response.get('payload_msg')
                     if isinstance(audio_data, bytes):
                         # 同时发送到TouchDesigner
                         await self._send_audio_to_td(audio_data)
                         yield audio_data
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收音频失败: {e}")
                 break
@@ -217,28 +233,23 @@ class TouchDesignerAudioAdapter(AudioAdapter):
                     length = len(chunk) + 4  # 加上chunk_id和total_chunks的4字节
                     msg_type = 4  # 音频分片类型
 
-                    packet = (struct.pack('<I', length) + struct.pack('<I', msg_type) + struct.pack(
-                        '<H',
-                        i
-                        ) + struct.pack('<H', total_chunks) + chunk)
+                    packet = _CHUNK_HEADER.pack(length, msg_type, i, total_chunks) + chunk
 
                     # 发送到TouchDesigner
-                    loop = asyncio.get_event_loop()
-                    await loop.sock_sendto(self.udp_socket, packet, (self.td_ip, self.td_port))
+                    await self._loop.sock_sendto(self.udp_socket, packet, (self.td_ip, self.td_port))
 
-                logger.debug(f"发送音频到TD (分片): {len(audio_data)} 字节, {total_chunks} 个分片")
+                logger.debug("发送音频到TD (分片): %d 字节, %d 个分片", len(audio_data), total_chunks)
             else:
                 # 构造UDP数据包: [4字节长度][4字节类型(1=音频)][音频数据]
                 length = len(audio_data)
                 msg_type = 1  # 音频类型
 
-                packet = struct.pack('<I', length) + struct.pack('<I', msg_type) + audio_data
+                packet = _HEADER.pack(length, msg_type) + audio_data
 
                 # 发送到TouchDesigner
-                loop = asyncio.get_event_loop()
-                await loop.sock_sendto(self.udp_socket, packet, (self.td_ip, self.td_port))
+                await self._loop.sock_sendto(self.udp_socket, packet, (self.td_ip, self.td_port))
 
-                logger.debug(f"发送音频到TD: {len(audio_data)} 字节")
+                logger.debug("发送音频到TD: %d 字节", len(audio_data))
 
         except Exception as e:
             logger.warning(f"发送音频到TouchDesigner失败: {e}")
@@ -266,10 +277,9 @@ class TouchDesignerAudioAdapter(AudioAdapter):
             length = len(status_data)
             msg_type = 3  # 状态类型
 
-            packet = struct.pack('<I', length) + struct.pack('<I', msg_type) + status_data
+            packet = _HEADER.pack(length, msg_type) + status_data
 
-            loop = asyncio.get_event_loop()
-            await loop.sock_sendto(self.udp_socket, packet, (self.td_ip, self.td_port))
+            await self._loop.sock_sendto(self.udp_socket, packet, (self.td_ip, self.td_port))
 
         except Exception as e:
             logger.warning(f"发送状态到TouchDesigner失败: {e}")
@@ -282,21 +292,29 @@ class TouchDesignerAudioAdapter(AudioAdapter):
                 if response:
                     await self.response_queue.put(response)
 
-                    # 发送事件状态到TouchDesigner
-                    if response.get('event'):
-                        event_name = str(response.get('event'))
-                        await self._send_status_to_td(f"事件: {event_name}")
+                    # 发送事件状态到TouchDesigner，连续相同的事件（如逐包的TTS音频）只发一次
+                    event = response.get('event')
+                    if event and event != self._last_status_event:
+                        self._last_status_event = event
+                        await self._send_status_to_td(f"事件: {event}")
 
             except Exception as e:
                 logger.error(f"接收豆包响应失败: {e}")
                 break
+        # 通知接收任务退出
+        self.response_queue.put_nowait(None)
 
     async def setup_audio_devices(self, p, stop_event: threading.Event) -> tuple[Optional[threading.Thread], Optional[threading.Thread]]:
         """TouchDesigner模式：音频通过UDP传输，跳过系统音频设备选择"""
         logger.info("TouchDesigner模式：音频通过UDP传输，跳过系统音频设备选择")
+
+        # 创建队列（兼容UnifiedAudioApp），没有本地播放，只保留最近的音频块
+        self._send_queue = queue.Queue()
+        self._play_queue = collections.deque(maxlen=50)
+
         return None, None
 
-    async def run_sender_task(self, send_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_sender_task(self, send_queue: Any, stop_event: threading.Event) -> None:
         """TouchDesigner发送任务 - 等待TouchDesigner连接和音频数据"""
         logger.info("TouchDesigner发送任务启动，等待TouchDesigner音频数据")
 
@@ -309,36 +327,26 @@ class TouchDesignerAudioAdapter(AudioAdapter):
         except Exception as e:
             logger.error(f"TouchDesigner发送任务异常: {e}")
 
+        # 唤醒接收任务退出
+        self.response_queue.put_nowait(None)
         logger.info("TouchDesigner发送任务结束")
 
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_receiver_task(self, play_queue: collections.deque, stop_event: threading.Event) -> None:
         """TouchDesigner接收任务"""
         logger.info("TouchDesigner接收任务启动")
         received_count = 0
 
         try:
             async for audio_data in self.receive_audio():
-                logger.debug(f"收到音频数据: {len(audio_data)} bytes")
                 if stop_event.is_set():
                     break
 
                 received_count += 1
-                logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
+                if received_count % 100 == 0:
+                    logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
 
                 # 将音频数据放入播放队列 (虽然TouchDesigner模式可能不需要本地播放)
-                try:
-                    play_queue.put_nowait({
-                        "payload_msg": audio_data
-                    })
-                except queue.Full:
-                    # 播放队列满时，移除最老的数据再放入新数据
-                    try:
-                        play_queue.get_nowait()
-                        play_queue.put_nowait({
-                            "payload_msg": audio_data
-                        })
-                    except queue.Empty:
-                        pass
+                play_queue.append({"payload_msg": audio_data})  # 队列满时自动丢弃最旧的数据
 
         except Exception as e:
             logger.error(f"TouchDesigner接收任务异常: {e}")
@@ -1,10 +1,13 @@
 import asyncio
+import collections
 import json
 import logging
 import queue
 import threading
 from typing import AsyncGenerator, Optional, Dict, Any
 
+import websockets
+
 from src.adapters.base import AudioAdapter, ConnectionConfig
 from src.adapters.type import AdapterType
 from src.volcengine import protocol
@@ -13,6 +16,9 @@ from src.volcengine.config import ws_connect_config
 
 logger = logging.getLogger(__name__)
 
+# 单个客户端允许积压的发送缓冲区大小，超出后跳过该客户端直到其追上
+_MAX_CLIENT_WRITE_BUFFER = 1024 * 1024
+
 
 class TouchDesignerWebRTCConnectionConfig(ConnectionConfig):
     """TouchDesigner WebRTC连接配置"""
@@ -36,6 +42,7 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
         self.client = None
         self.response_queue = asyncio.Queue()
         self._receiver_task = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
         # WebSocket信令服务器配置
         self.signaling_port = self.config.get("signaling_port", 8080)
@@ -61,6 +68,7 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
 
     async def connect(self) -> bool:
         """建立与豆包的连接和WebRTC信令服务"""
+        self._loop = asyncio.get_running_loop()
         try:
             # 1. 建立与豆包的WebSocket连接
             self.client = VolcengineClient(ws_connect_config, self.bot_name, self.tts_config)
@@ -183,7 +191,7 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
             if len(audio_data) > 0:
                 # 转发到豆包
                 await self.send_audio(audio_data)
-                logger.debug(f"从TD接收并转发音频: {len(audio_data)} 字节")
+                logger.debug("从TD接收并转发音频: %d 字节", len(audio_data))
         except Exception as e:
             logger.error(f"处理音频数据失败: {e}")
 
@@ -248,19 +256,41 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
         """接收来自豆包的音频数据流"""
         while self.is_connected:
             try:
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或接收任务已结束
+                    break
                 if response.get('event') == protocol.ServerEvent.TTS_RESPONSE:
                     audio_data = response.get('payload_msg')
                     if isinstance(audio_data, bytes):
                         # 同时发送到TouchDesigner
                         await self._send_audio_to_td(audio_data)
                         yield audio_data
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收音频失败: {e}")
                 break
 
+    def _broadcast(self, message: Dict[str, Any]) -> None:
+        """发送到所有连接的TouchDesigner客户端
+
+        websockets.broadcast 只写入各连接的发送缓冲区，不做背压；
+        发送缓冲区积压超过 _MAX_CLIENT_WRITE_BUFFER 的慢客户端本次直接跳过，避免缓冲区无限增长
+        """
+        targets = []
+        for client_id, connection in self.peer_connections.items():
+            if not connection.get("connected") or "websocket" not in connection:
+                continue
+            websocket = connection["websocket"]
+            if websocket.transport.get_write_buffer_size() > _MAX_CLIENT_WRITE_BUFFER:
+                logger.debug("TD客户端 %s 发送缓冲区积压，跳过本条消息", client_id)
+                continue
+            targets.append(websocket)
+
+        try:
+            websockets.broadcast(targets, json.dumps(message), raise_exceptions=True)
+        except ExceptionGroup as eg:
+            for e in eg.exceptions:
+                logger.warning(f"发送到TD客户端失败: {e} ({e.__cause__})")
+
     async def _send_audio_to_td(self, audio_data: bytes):
         """发送音频数据到TouchDesigner (通过WebSocket)"""
         try:
@@ -272,18 +302,12 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
                 "type": "audio-response",
                 "audio": audio_b64,
                 "length": len(audio_data),
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": self._loop.time()
             }
 
-            # 发送到所有连接的TouchDesigner客户端
-            for client_id, connection in self.peer_connections.items():
-                if connection.get("connected") and "websocket" in connection:
-                    try:
-                        await connection["websocket"].send(json.dumps(message))
-                    except Exception as e:
-                        logger.warning(f"发送音频到TD客户端 {client_id} 失败: {e}")
+            self._broadcast(message)
 
-            logger.debug(f"发送音频到TD: {len(audio_data)} 字节")
+            logger.debug("发送音频到TD: %d 字节", len(audio_data))
 
         except Exception as e:
             logger.warning(f"发送音频到TouchDesigner失败: {e}")
@@ -310,16 +334,10 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
             message = {
                 "type": "status",
                 "message": status,
-                "timestamp": asyncio.get_event_loop().time()
+                "timestamp": self._loop.time()
             }
 
-            # 发送到所有连接的TouchDesigner客户端
-            for client_id, connection in self.peer_connections.items():
-                if connection.get("connected") and "websocket" in connection:
-                    try:
-                        await connection["websocket"].send(json.dumps(message))
-                    except Exception as e:
-                        logger.warning(f"发送状态到TD客户端 {client_id} 失败: {e}")
+            self._broadcast(message)
 
         except Exception as e:
             logger.warning(f"发送状态到TouchDesigner失败: {e}")
@@ -340,19 +358,20 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
             except Exception as e:
                 logger.error(f"接收豆包响应失败: {e}")
                 break
+        # 通知接收任务退出
+        self.response_queue.put_nowait(None)
 
     async def setup_audio_devices(self, p, stop_event: threading.Event) -> tuple[Optional[threading.Thread], Optional[threading.Thread]]:
         """TouchDesigner WebRTC模式：音频通过WebRTC传输，跳过系统音频设备选择"""
         logger.info("TouchDesigner WebRTC模式：音频通过WebRTC传输，跳过系统音频设备选择")
         
-        # 创建队列（兼容UnifiedAudioApp）
-        import queue
+        # 创建队列（兼容UnifiedAudioApp），没有本地播放，只保留最近的音频块
         self._send_queue = queue.Queue()
-        self._play_queue = queue.Queue()
+        self._play_queue = collections.deque(maxlen=50)
         
         return None, None
 
-    async def run_sender_task(self, send_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_sender_task(self, send_queue: Any, stop_event: threading.Event) -> None:
         """TouchDesigner WebRTC发送任务 - 等待TouchDesigner WebRTC连接和音频数据"""
         logger.info("TouchDesigner WebRTC发送任务启动，等待TouchDesigner连接")
 
@@ -368,36 +387,26 @@ class TouchDesignerWebRTCAudioAdapter(AudioAdapter):
         except Exception as e:
             logger.error(f"TouchDesigner WebRTC发送任务异常: {e}")
 
+        # 唤醒接收任务退出
+        self.response_queue.put_nowait(None)
         logger.info("TouchDesigner WebRTC发送任务结束")
 
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_receiver_task(self, play_queue: collections.deque, stop_event: threading.Event) -> None:
         """TouchDesigner WebRTC接收任务"""
         logger.info("TouchDesigner WebRTC接收任务启动")
         received_count = 0
 
         try:
             async for audio_data in self.receive_audio():
-                logger.debug(f"收到音频数据: {len(audio_data)} bytes")
                 if stop_event.is_set():
                     break
 
                 received_count += 1
-                logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
+                if received_count % 100 == 0:
+                    logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
 
                 # 将音频数据放入播放队列
-                try:
-                    play_queue.put_nowait({
-                        "payload_msg": audio_data
-                    })
-                except queue.Full:
-                    # 播放队列满时，移除最老的数据再放入新数据
-                    try:
-                        play_queue.get_nowait()
-                        play_queue.put_nowait({
-                            "payload_msg": audio_data
-                        })
-                    except queue.Empty:
-                        pass
+                play_queue.append({"payload_msg": audio_data})  # 队列满时自动丢弃最旧的数据
 
         except Exception as e:
             logger.error(f"TouchDesigner WebRTC接收任务异常: {e}")
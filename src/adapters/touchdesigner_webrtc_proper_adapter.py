@@ -1,4 +1,5 @@
 import asyncio
+import collections
 import json
 import logging
 import queue
@@ -6,9 +7,7 @@ import threading
 from typing import AsyncGenerator, Optional, Dict, Any
 import websockets
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate
-from aiortc.contrib.media import MediaPlayer, MediaRelay
-from aiortc.rtcrtpsender import RTCRtpSender
-from aiortc.rtcrtpreceiver import RTCRtpReceiver
+from aiortc.contrib.media import MediaRelay
 import numpy as np
 
 from src.adapters.base import AudioAdapter, ConnectionConfig
@@ -68,7 +67,7 @@ class AudioTrackSender:
         if self._running:
             # 通过WebRTC发送音频数据
             # 这里需要将bytes转换为适当的音频帧格式
-            logger.debug(f"通过WebRTC发送音频: {len(audio_data)} 字节")
+            logger.debug("通过WebRTC发送音频: %d 字节", len(audio_data))
 
 
 class TouchDesignerProperWebRTCAudioAdapter(AudioAdapter):
@@ -216,23 +215,19 @@ class TouchDesignerProperWebRTCAudioAdapter(AudioAdapter):
                 if audio_data:
                     # 转发到豆包
                     await self.send_audio(audio_data)
-                    logger.debug(f"从TD接收并转发音频: {len(audio_data)} 字节")
+                    logger.debug("从TD接收并转发音频: %d 字节", len(audio_data))
         except Exception as e:
             logger.error(f"处理音频流失败: {e}")
 
     def _audio_frame_to_bytes(self, frame) -> bytes:
         """将音频帧转换为字节数据"""
         try:
-            # 假设frame是AudioFrame对象
-            # 将其转换为PCM字节数据
-            if hasattr(frame, 'to_ndarray'):
-                # 获取numpy数组
-                array = frame.to_ndarray()
-                # 转换为16位PCM
-                if array.dtype != np.int16:
-                    array = (array * 32767).astype(np.int16)
-                return array.tobytes()
-            return b''
+            # frame是AudioFrame对象，获取numpy数组
+            array = frame.to_ndarray()
+            # 转换为16位PCM
+            if array.dtype != np.int16:
+                array = (array * 32767).astype(np.int16)
+            return array.tobytes()
         except Exception as e:
             logger.error(f"音频帧转换失败: {e}")
             return b''
@@ -335,15 +330,15 @@ class TouchDesignerProperWebRTCAudioAdapter(AudioAdapter):
         """接收来自豆包的音频数据流"""
         while self.is_connected:
             try:
-                response = await asyncio.wait_for(self.response_queue.get(), timeout=1.0)
+                response = await self.response_queue.get()
+                if response is None:  # 发送任务或接收任务已结束
+                    break
                 if response.get('event') == protocol.ServerEvent.TTS_RESPONSE:
                     audio_data = response.get('payload_msg')
                     if isinstance(audio_data, bytes):
                         # 发送到TouchDesigner
                         await self._send_audio_to_touchdesigner(audio_data)
                         yield audio_data
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error(f"接收音频失败: {e}")
                 break
@@ -356,7 +351,7 @@ class TouchDesignerProperWebRTCAudioAdapter(AudioAdapter):
                 if sender:
                     await sender.send(audio_data)
             
-            logger.debug(f"通过WebRTC发送音频到TD: {len(audio_data)} 字节")
+            logger.debug("通过WebRTC发送音频到TD: %d 字节", len(audio_data))
 
         except Exception as e:
             logger.warning(f"发送音频到TouchDesigner失败: {e}")
@@ -383,19 +378,20 @@ class TouchDesignerProperWebRTCAudioAdapter(AudioAdapter):
             except Exception as e:
                 logger.error(f"接收豆包响应失败: {e}")
                 break
+        # 通知接收任务退出
+        self.response_queue.put_nowait(None)
 
     async def setup_audio_devices(self, p, stop_event: threading.Event) -> tuple[Optional[threading.Thread], Optional[threading.Thread]]:
         """TouchDesigner WebRTC模式：音频通过WebRTC传输"""
         logger.info("TouchDesigner WebRTC模式：音频通过WebRTC传输")
         
-        # 创建队列（兼容UnifiedAudioApp）
-        import queue
+        # 创建队列（兼容UnifiedAudioApp），没有本地播放，只保留最近的音频块
         self._send_queue = queue.Queue()
-        self._play_queue = queue.Queue()
+        self._play_queue = collections.deque(maxlen=50)
         
         return None, None
 
-    async def run_sender_task(self, send_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_sender_task(self, send_queue: Any, stop_event: threading.Event) -> None:
         """TouchDesigner WebRTC发送任务"""
         logger.info("TouchDesigner WebRTC发送任务启动")
 
@@ -411,35 +407,26 @@ class TouchDesignerProperWebRTCAudioAdapter(AudioAdapter):
         except Exception as e:
             logger.error(f"TouchDesigner WebRTC发送任务异常: {e}")
 
+        # 唤醒接收任务退出
+        self.response_queue.put_nowait(None)
         logger.info("TouchDesigner WebRTC发送任务结束")
 
-    async def run_receiver_task(self, play_queue: queue.Queue, stop_event: threading.Event) -> None:
+    async def run_receiver_task(self, play_queue: collections.deque, stop_event: threading.Event) -> None:
         """TouchDesigner WebRTC接收任务"""
         logger.info("TouchDesigner WebRTC接收任务启动")
         received_count = 0
 
         try:
             async for audio_data in self.receive_audio():
-                logger.debug(f"收到音频数据: {len(audio_data)} bytes")
                 if stop_event.is_set():
                     break
 
                 received_count += 1
-                logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
+                if received_count % 100 == 0:
+                    logger.debug(f"收到音频数据 #{received_count}，大小: {len(audio_data)} bytes")
 
                 # 将音频数据放入播放队列（用于本地播放）
-                try:
-                    play_queue.put_nowait({
-                        "payload_msg": audio_data
-                    })
-                except queue.Full:
-                    try:
-                        play_queue.get_nowait()
-                        play_queue.put_nowait({
-                            "payload_msg": audio_data
-                        })
-                    except queue.Empty:
-                        pass
+                play_queue.append({"payload_msg": audio_data})  # 队列满时自动丢弃最旧的数据
 
         except Exception as e:
             logger.error(f"TouchDesigner WebRTC接收任务异常: {e}")
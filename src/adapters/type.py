@@ -8,3 +8,14 @@ class AdapterType(Enum):
     TOUCH_DESIGNER_WEBRTC = "touchdesigner_webrtc"
     TOUCH_DESIGNER_WEBRTC_PROPER = "touchdesigner_webrtc_proper"
     TEXT_INPUT = "text_input"
+
+
+# 命令行参数与GUI下拉框中使用的适配器名称
+ADAPTER_NAMES: dict[str, AdapterType] = {
+    "local": AdapterType.LOCAL,
+    "browser": AdapterType.BROWSER,
+    "touchdesigner": AdapterType.TOUCH_DESIGNER,
+    "touchdesigner-webrtc": AdapterType.TOUCH_DESIGNER_WEBRTC,
+    "touchdesigner-webrtc-proper": AdapterType.TOUCH_DESIGNER_WEBRTC_PROPER,
+    "text-input": AdapterType.TEXT_INPUT,
+    }
@@ -0,0 +1,123 @@
+import contextlib
+import logging
+import queue
+import subprocess
+import threading
+from typing import Callable, Optional
+
+from src.constants import VOLCENGINE_RECV_PCM_AUDIO_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# 待写入 ffmpeg 的页面上限，解码进程卡住时丢弃新页面，不让队列无限增长
+_MAX_PENDING_PAGES = 256
+
+
+class OggOpusDecoder:
+    """OGG/Opus 流式解码器 - 常驻 ffmpeg 进程，逐页写入，输出 float32 PCM"""
+
+    def __init__(self, on_pcm: Callable[[memoryview], None], on_reset: Optional[Callable[[], None]] = None,
+                 sample_rate: int = VOLCENGINE_RECV_PCM_AUDIO_SAMPLE_RATE, channels: int = 1):
+        self.on_pcm = on_pcm
+        self.on_reset = on_reset
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._process: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._writer: Optional[threading.Thread] = None
+        self._pages: queue.Queue[Optional[bytes]] = queue.Queue(maxsize=_MAX_PENDING_PAGES)
+
+    def start(self, previous_reader: Optional[threading.Thread] = None) -> None:
+        """启动 ffmpeg 解码进程及输入写入、输出读取线程
+
+        previous_reader 为被 reset 替换的旧读取线程，新读取线程等它结束后再清空缓冲区，
+        保证任一时刻只有一个线程调用 on_pcm/on_reset
+        """
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg", "-loglevel", "quiet", "-fflags", "nobuffer",
+                "-f", "ogg", "-i", "pipe:0",
+                "-f", "f32le", "-ar", str(self.sample_rate), "-ac", str(self.channels), "pipe:1"
+                ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0
+            )
+        self._reader = threading.Thread(target=self._read_loop, args=(self._process, previous_reader), daemon=True)
+        self._reader.start()
+        # 每个进程使用独立的页面队列，重置时未写入的旧页面随旧队列一起丢弃
+        self._pages = queue.Queue(maxsize=_MAX_PENDING_PAGES)
+        self._writer = threading.Thread(target=self._write_loop, args=(self._process, self._pages), daemon=True)
+        self._writer.start()
+        logger.info(f"OGG解码进程已启动 (pid={self._process.pid})")
+
+    @staticmethod
+    def _write_loop(process: subprocess.Popen, pages: queue.Queue) -> None:
+        """把 OGG 页面写入 ffmpeg，管道阻塞只影响本线程"""
+        with contextlib.suppress(BrokenPipeError):  # 进程被关闭时管道断开
+            while (page := pages.get()) is not None:
+                process.stdin.write(page)
+
+    def _read_loop(self, process: subprocess.Popen, previous_reader: Optional[threading.Thread]) -> None:
+        """读取解码后的 PCM，按完整样本回调（复用同一块缓冲区，回调需同步拷走数据）"""
+        if previous_reader is not None:
+            # 旧进程已被 kill，旧读取线程很快结束；之后由本线程清空缓冲区，旧输出不会在清空后写入
+            previous_reader.join()
+            if self.on_reset:
+                self.on_reset()
+        frame_bytes = 4 * self.channels
+        buf = bytearray(4096)
+        view = memoryview(buf)
+        filled = 0
+        while True:
+            n = process.stdout.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+            usable = filled - filled % frame_bytes
+            if process is not self._process:  # 已被 reset 替换，旧进程的输出直接丢弃
+                break
+            if usable:
+                self.on_pcm(view[:usable])
+            # 不足一个样本的尾部挪到缓冲区开头
+            buf[:filled - usable] = buf[usable:filled]
+            filled -= usable
+
+    def feed(self, ogg_page: bytes) -> None:
+        """提交一个 OGG 页面，由写入线程送入解码进程"""
+        # ffmpeg 意外退出后写入线程随之结束，此时丢弃页面，避免队列无人消费而无限增长
+        if self._process.poll() is not None:
+            logger.debug("OGG解码进程已退出，丢弃音频页面")
+            return
+        try:
+            self._pages.put_nowait(ogg_page)
+        except queue.Full:
+            logger.warning("OGG解码进程处理过慢，丢弃音频页面")
+
+    def reset(self) -> None:
+        """丢弃解码器内尚未输出的音频（打断时调用）
+
+        先切换到新进程再在后台线程中回收旧进程，不在事件循环中等待进程退出和线程结束；
+        已解码的音频由新读取线程通过 on_reset 清空
+        """
+        old = (self._process, self._pages, self._writer, self._reader)
+        self._process.kill()  # 立即停止旧进程继续输出
+        self.start(previous_reader=self._reader)
+        threading.Thread(target=self._shutdown, args=old, daemon=True).start()
+
+    def close(self) -> None:
+        """关闭解码进程"""
+        if self._process is None:
+            return
+        self._shutdown(self._process, self._pages, self._writer, self._reader)
+        self._process = None
+
+    @staticmethod
+    def _shutdown(process: subprocess.Popen, pages: queue.Queue, writer: threading.Thread,
+                  reader: threading.Thread) -> None:
+        """结束解码进程并等待其写入、读取线程退出"""
+        process.kill()
+        # 队列已满时写入线程不在等待页面，进程被 kill 后它的下一次写入会因管道断开而退出
+        with contextlib.suppress(queue.Full):
+            pages.put_nowait(None)
+        process.wait()
+        writer.join()
+        process.stdin.close()
+        reader.join()  # 确保旧进程的输出不会再写入缓冲区
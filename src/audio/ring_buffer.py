@@ -0,0 +1,48 @@
+import numpy as np
+
+
+class PcmRingBuffer:
+    """单生产者/单消费者 PCM 环形缓冲区（float32 样本）
+
+    生产者只推进 _head 和 _skip_to，消费者只推进 _tail，两端无需加锁。
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self._head = 0  # 累计写入样本数
+        self._tail = 0  # 累计读取样本数
+        self._skip_to = 0  # 溢出时消费者需跳过的位置
+
+    def __len__(self) -> int:
+        return self._head - max(self._tail, self._skip_to)
+
+    def write(self, data: bytes | memoryview) -> bool:
+        """写入 PCM 数据，空间不足时覆盖最旧的数据并返回 False"""
+        samples = np.frombuffer(data, dtype=np.float32, count=len(data) // 4)[-self.capacity:]
+        n = len(samples)
+        start = self._head % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start:start + first] = samples[:first]
+        self._buf[:n - first] = samples[first:]
+        self._head += n
+        # clear() 之后 _skip_to 可能领先于 _tail，按消费者实际的读取位置判断是否溢出
+        if self._head - max(self._tail, self._skip_to) <= self.capacity:
+            return True
+        # 保留最新的音频，让消费者追到实时位置（跳过位置只前进，不回放已丢弃的数据）
+        self._skip_to = max(self._skip_to, self._head - self.capacity)
+        return False
+
+    def read(self, n: int) -> bytes:
+        """读取至多 n 个样本"""
+        tail = max(self._tail, self._skip_to)
+        n = min(n, self._head - tail)
+        start = tail % self.capacity
+        first = min(n, self.capacity - start)
+        data = self._buf[start:start + first].tobytes() + self._buf[:n - first].tobytes()
+        self._tail = tail + n
+        return data
+
+    def clear(self) -> None:
+        """丢弃所有未播放的数据（由生产者调用）"""
+        self._skip_to = self._head
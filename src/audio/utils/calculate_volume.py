@@ -1,18 +1,20 @@
-import struct
+import numpy as np
 
 
 def calculate_volume(audio_data: bytes) -> float:
     """计算音频数据的音量（RMS）"""
-    if len(audio_data) == 0:
+    if len(audio_data) < 2:
         return 0.0
 
-    # 将bytes转换为int16数组
-    audio_samples = struct.unpack(f'{len(audio_data) // 2}h', audio_data)
+    # 零拷贝视为int16数组
+    audio_samples = np.frombuffer(audio_data, dtype=np.int16, count=len(audio_data) // 2)
+    # 全零帧（如麦克风静音）直接返回，any() 遇到首个非零样本即停止
+    if not audio_samples.any():
+        return 0.0
 
-    # 计算RMS音量
-    squares = [sample ** 2 for sample in audio_samples]
-    mean_square = sum(squares) / len(squares)
-    rms = (mean_square ** 0.5)
+    # 转float后一次点积得到平方和
+    audio_samples = audio_samples.astype(np.float32)
+    rms = float(np.sqrt(np.dot(audio_samples, audio_samples) / len(audio_samples)))
 
     # 归一化到0-1范围
     return min(rms / 32767.0, 1.0)
@@ -1,6 +1,8 @@
 import asyncio
+import contextlib
 import logging
-import queue
+import signal
+import sys
 import threading
 
 import pyaudio
@@ -10,6 +12,27 @@ from src.adapters.type import AdapterType
 
 logger = logging.getLogger(__name__)
 
+_SEPARATOR = "=" * 60
+_TEXT_INPUT_BANNER = "\n".join([
+    "", _SEPARATOR,
+    "💬 文字输入对话已就绪！",
+    "💡 使用提示：",
+    "   - 在提示符处输入文字，AI会朗读回复",
+    "   - 输入 'quit' 或 'exit' 退出程序",
+    "   - 按 Ctrl+C 也可以退出程序",
+    _SEPARATOR, "", "",
+    ])
+_VOICE_BANNER = "\n".join([
+    "", _SEPARATOR,
+    "🎤 语音对话已就绪！",
+    "💡 使用提示：",
+    "   - 正常音量说话即可，系统会自动检测语音活动",
+    "   - 说话时会看到 🎤 发送语音 的提示",
+    "   - 静音时会显示 🔇 静音检测中 的状态",
+    "   - 按 Ctrl+C 退出程序",
+    _SEPARATOR, "", "",
+    ])
+
 
 class UnifiedAudioApp:
     """统一音频应用 - 支持多种适配器"""
@@ -25,9 +48,6 @@ class UnifiedAudioApp:
 
         # 音频相关
         self.p = pyaudio.PyAudio()
-        # 使用有限队列避免延迟累积
-        self.send_queue = queue.Queue()  # 最多缓存50个音频块
-        self.play_queue = queue.Queue()  # 播放队列更小，减少延迟
         self.stop_event = threading.Event()
 
         # 线程
@@ -164,45 +184,57 @@ class UnifiedAudioApp:
         if not await self.initialize():
             return
 
+        # Ctrl+C 交给事件循环处理：置位停止事件并取消发送/接收任务，随后统一清理
+        if threading.current_thread() is threading.main_thread():
+            with contextlib.suppress(NotImplementedError):
+                asyncio.get_running_loop().add_signal_handler(signal.SIGINT, self._on_sigint)
+
         self.recorder, self.player = await self.adapter.setup_audio_devices(self.p, self.stop_event)
 
+        stop_watcher = None
         try:
             logger.info("启动音频处理任务")
 
-            # 提示用户如何使用
-            print("\n" + "=" * 60)
-            if self.adapter_type == AdapterType.TEXT_INPUT:
-                print("💬 文字输入对话已就绪！")
-                print("💡 使用提示：")
-                print("   - 在提示符处输入文字，AI会朗读回复")
-                print("   - 输入 'quit' 或 'exit' 退出程序")
-                print("   - 按 Ctrl+C 也可以退出程序")
-            else:
-                print("🎤 语音对话已就绪！")
-                print("💡 使用提示：")
-                print("   - 正常音量说话即可，系统会自动检测语音活动")
-                print("   - 说话时会看到 🎤 发送语音 的提示")
-                print("   - 静音时会显示 🔇 静音检测中 的状态")
-                print("   - 按 Ctrl+C 退出程序")
-            print("=" * 60 + "\n")
+            # 提示用户如何使用（一次性写出整段提示）
+            sys.stdout.write(_TEXT_INPUT_BANNER if self.adapter_type == AdapterType.TEXT_INPUT else _VOICE_BANNER)
+            sys.stdout.flush()
 
             # 启动发送和接收任务
             # 使用适配器内部的发送队列和播放队列
-            self.sender_task = asyncio.create_task(
-                self.adapter.run_sender_task(self.adapter._send_queue, self.stop_event))
-            self.receiver_task = asyncio.create_task(
-                self.adapter.run_receiver_task(self.adapter._play_queue, self.stop_event))
-
-            # 等待任务完成
-            await asyncio.gather(self.sender_task, self.receiver_task)
-
-        except KeyboardInterrupt:
+            # TaskGroup 退出时保证两个任务都已结束，任一任务异常会取消另一个
+            async with asyncio.TaskGroup() as tg:
+                self.sender_task = tg.create_task(
+                    self.adapter.run_sender_task(self.adapter._send_queue, self.stop_event))
+                self.receiver_task = tg.create_task(
+                    self.adapter.run_receiver_task(self.adapter._play_queue, self.stop_event))
+                # 监视停止事件，不依赖各任务自行检查 stop_event；不加入任务组，避免任务正常结束后仍等待它
+                stop_watcher = asyncio.create_task(self._cancel_tasks_on_stop())
+
+        except* KeyboardInterrupt:
             logger.info("收到中断信号")
-        except Exception as e:
-            logger.error(f"运行时错误: {e}")
+        except* Exception as eg:
+            # TaskGroup 把任务异常包装为 ExceptionGroup，逐个记录原始异常
+            for e in eg.exceptions:
+                logger.error(f"运行时错误: {e}", exc_info=e)
         finally:
+            if stop_watcher:
+                stop_watcher.cancel()
+            # cleanup 会置位 stop_event，同时释放监视任务占用的线程
             await self.cleanup()
 
+    def _on_sigint(self):
+        """Ctrl+C：不等待任务自行检查 stop_event（如阻塞在 input() 上的文字输入），直接取消"""
+        self.stop_event.set()
+        for task in (self.sender_task, self.receiver_task):
+            if task:
+                task.cancel()
+
+    async def _cancel_tasks_on_stop(self):
+        """停止事件置位后立即取消发送和接收任务"""
+        await asyncio.to_thread(self.stop_event.wait)
+        self.sender_task.cancel()
+        self.receiver_task.cancel()
+
     async def cleanup(self):
         """清理资源"""
         logger.info("开始清理资源...")
@@ -210,24 +242,6 @@ class UnifiedAudioApp:
         # 停止事件
         self.stop_event.set()
 
-        # 取消任务
-        if self.sender_task:
-            self.sender_task.cancel()
-        if self.receiver_task:
-            self.receiver_task.cancel()
-
-        # 等待任务结束
-        if self.sender_task:
-            try:
-                await self.sender_task
-            except asyncio.CancelledError:
-                pass
-        if self.receiver_task:
-            try:
-                await self.receiver_task
-            except asyncio.CancelledError:
-                pass
-
         # 断开适配器
         if self.adapter:
             await self.adapter.disconnect()
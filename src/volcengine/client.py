@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import gzip
 import json
 import logging
@@ -22,6 +23,15 @@ async def connect_ws(config):
 
 seq = 0
 
+# 固定不变的请求负载只压缩一次
+_EMPTY_PAYLOAD = gzip.compress(b"{}")
+
+
+@functools.cache
+def _silence_audio(duration_ms: int) -> bytes:
+    """按时长缓存静音音频 (PCM格式: 16kHz, int16)"""
+    return bytes(16000 * duration_ms // 1000 * 2)
+
 
 class VolcengineClient:
     def __init__(self, config: Dict[str, Any], bot_name: str = "小塔", tts_config: Dict[str, Any] = None):
@@ -59,7 +69,7 @@ class VolcengineClient:
             self.is_running = True
             logger.info(f"url: {self.config['base_url']}, headers: {self.config['headers']}")
             self.ws = await connect_ws(self.config)
-            self.logid = self.ws.response_headers.get("X-Tt-Logid") if hasattr(self.ws, 'response_headers') else None
+            self.logid = self.ws.response.headers.get("X-Tt-Logid")
             logger.info(f"dialog server response logid: {self.logid}")
 
             await self.request_start_connection()
@@ -89,8 +99,7 @@ class VolcengineClient:
         try:
             start_connection_request = bytearray(protocol.generate_header())
             start_connection_request.extend(int(1).to_bytes(4, 'big'))
-            payload_bytes = str.encode("{}")
-            payload_bytes = gzip.compress(payload_bytes)
+            payload_bytes = _EMPTY_PAYLOAD
             start_connection_request.extend((len(payload_bytes)).to_bytes(4, 'big'))
             start_connection_request.extend(payload_bytes)
             logger.info("requesting start-connection")
@@ -108,8 +117,7 @@ class VolcengineClient:
         try:
             finish_connection_request = bytearray(protocol.generate_header())
             finish_connection_request.extend(int(2).to_bytes(4, 'big'))
-            payload_bytes = str.encode("{}")
-            payload_bytes = gzip.compress(payload_bytes)
+            payload_bytes = _EMPTY_PAYLOAD
             finish_connection_request.extend((len(payload_bytes)).to_bytes(4, 'big'))
             finish_connection_request.extend(payload_bytes)
             logger.info("requesting stop-connection")
@@ -155,8 +163,7 @@ class VolcengineClient:
         try:
             finish_session_request = bytearray(protocol.generate_header())
             finish_session_request.extend(int(102).to_bytes(4, 'big'))
-            payload_bytes = str.encode("{}")
-            payload_bytes = gzip.compress(payload_bytes)
+            payload_bytes = _EMPTY_PAYLOAD
             finish_session_request.extend((len(self.session_id)).to_bytes(4, 'big'))
             finish_session_request.extend(str.encode(self.session_id))
             finish_session_request.extend((len(payload_bytes)).to_bytes(4, 'big'))
@@ -208,10 +215,7 @@ class VolcengineClient:
 
     def generate_silence_audio(self, duration_ms: int = 100) -> bytes:
         """生成静音音频数据 (PCM格式: 16kHz, int16, 小端序)"""
-        sample_rate = 16000
-        samples_count = int(sample_rate * duration_ms / 1000)
-        silence_data = bytearray(samples_count * 2)  # int16 = 2 bytes per sample
-        return bytes(silence_data)
+        return _silence_audio(duration_ms)
 
     async def push_audio(self, audio: bytes) -> None:
         global seq
@@ -30,6 +30,10 @@ class ServerEvent(IntEnum):
     CHAT_RESPONSE = 550
     CHAT_ENDED = 559
 
+
+# 事件值到名称的映射，避免在接收循环里反复构造枚举
+SERVER_EVENT_NAMES = {e.value: e.name for e in ServerEvent}
+
 PROTOCOL_VERSION = 0b0001
 DEFAULT_HEADER_SIZE = 0b0001
 